@@ -6,26 +6,51 @@ Run with:
   python main.py
 
 Authentication:
-  - Codex CLI (`codex exec`) - uses your ChatGPT subscription
+  - Codex - uses your ChatGPT subscription. With a `codex login` in
+    ~/.codex/auth.json the Responses API is called directly; otherwise
+    the Codex CLI (`codex exec`) is used
   - Claude CLI (`claude -p`) - uses your Claude Code subscription
 
-Configuration:
-  (none)
+Configuration (environment or backend/.env):
+  CLI_POOL_SIZE - pre-spawned CLI processes kept warm per provider (default 2)
+  MAX_CONCURRENCY - provider calls allowed to run at the same time (default 4)
+  CODEX_HOME - Codex config directory holding auth.json (default ~/.codex)
+  CODEX_MODEL - model used for direct Codex API calls (default gpt-5)
+  REDIS_URL - store sessions in Redis instead of process memory, which lets
+              several uvicorn workers share them (requires `pip install redis`)
+  SSL_CERT_FILE / SSL_CERT_DIR - CA certificates to trust for outgoing HTTPS
+              instead of the certifi bundle (e.g. behind an intercepting proxy)
 """
 
 import asyncio
+import base64
+import functools
+import gzip
+import hashlib
+import heapq
+import os
 import re
 import shutil
+import ssl
 import sys
 import tempfile
 import time
 import uuid
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
 from pathlib import Path
+from typing import Annotated, Any, AsyncIterator, Awaitable, Callable, ClassVar, Literal
 
+import certifi
+import httpx
+import orjson
+from cachetools import TTLCache
 from dotenv import load_dotenv
-from fastapi import FastAPI, HTTPException
-from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+from fastapi.routing import APIRoute
+from pydantic import BaseModel, ConfigDict, Field
 
 # Load .env file automatically (from backend directory)
 ENV_FILE = Path(__file__).parent / ".env"
@@ -34,47 +59,434 @@ load_dotenv(ENV_FILE)
 # Configuration
 MAX_CONTEXT_CHARS = 50000
 MAX_QUESTION_CHARS = 2000
+MAX_BATCH_QUESTIONS = 10
+MAX_HISTORY_MESSAGES = 50
 SESSION_EXPIRY_SECONDS = 3600  # 1 hour
+ANSWER_CACHE_SIZE = 1024
+ANSWER_CACHE_TTL_SECONDS = 600  # 10 minutes
+
+# Returned when a provider produced no text; never cached
+NO_RESPONSE_ANSWER = "No response generated."
+
+# Sentence-ending punctuation followed by space or newline
+_SENTENCE_RE = re.compile(r'[.!?][\s\n]')
 
 # Codex CLI configuration
 CODEX_CLI_COMMAND = "codex"
 
+# Codex API configuration (ChatGPT login from `codex login`)
+CODEX_HOME = Path(os.getenv("CODEX_HOME", Path.home() / ".codex"))
+CODEX_AUTH_FILE = CODEX_HOME / "auth.json"
+# How long parsed login credentials are trusted before auth.json is stat'ed again
+CODEX_CREDENTIALS_TTL_SECONDS = 30.0
+CODEX_BASE_URL = "https://chatgpt.com"
+CODEX_RESPONSES_PATH = "/backend-api/codex/responses"
+# OAuth endpoint and public client id the Codex CLI refreshes its login with
+CODEX_TOKEN_URL = "https://auth.openai.com/oauth/token"
+CODEX_CLIENT_ID = "app_EMoamEEZ73f0CkXaXp7hrann"
+CODEX_MODEL = os.getenv("CODEX_MODEL", "gpt-5")
+
 # Claude CLI configuration
 CLAUDE_CLI_COMMAND = "claude"
 
+# CLI locations, resolved once since PATH does not change while serving
+CODEX_CLI_PATH = shutil.which(CODEX_CLI_COMMAND)
+CLAUDE_CLI_PATH = shutil.which(CLAUDE_CLI_COMMAND)
+
+# Number of idle CLI processes kept warm per provider
+CLI_POOL_SIZE = int(os.getenv("CLI_POOL_SIZE", "2"))
+
+# How long a CLI process gets to exit after SIGTERM, and again after SIGKILL
+WORKER_STOP_TIMEOUT_SECONDS = 2.0
+
+# Upper bound on provider calls running at once, across all requests
+MAX_CONCURRENCY = int(os.getenv("MAX_CONCURRENCY", "4"))
+
+# Session store: Redis when REDIS_URL is set, process memory otherwise
+REDIS_URL = os.getenv("REDIS_URL", "")
+SESSION_KEY_PREFIX = "sess:"
+
+if REDIS_URL:
+    import redis.asyncio as redis
+
+    redis_client = redis.from_url(REDIS_URL)
+else:
+    redis_client = None
+
 # In-memory session store
 sessions: dict[str, dict] = {}
 
-app = FastAPI(title="Page Q&A Backend")
+# (expiry time, session id) min-heap, so cleanup only touches expired sessions
+_expiry_heap: list[tuple[float, str]] = []
+
+
+@dataclass
+class OutputSink:
+    """Reusable target for `codex exec --output-last-message`.
+
+    Backed by a fixed file in a directory created once per process. Sinks
+    are recycled between workers, so requests never create or unlink files.
+    A real path (rather than a /proc/self/fd/N alias of an inherited memfd)
+    keeps working when `codex` is a launcher that execs the actual binary
+    without passing its descriptors on.
+    """
+
+    fd: int
+    path: str
+    # The sink path is fixed, so the full codex command line is built once
+    argv: tuple[str, ...] = field(init=False)
+
+    _free: ClassVar[list["OutputSink"]] = []
+    _dir: ClassVar[tempfile.TemporaryDirectory | None] = None
+    _count: ClassVar[int] = 0
+
+    def __post_init__(self) -> None:
+        self.argv = (
+            CODEX_CLI_PATH,
+            "exec",
+            "--skip-git-repo-check",
+            "--output-last-message",
+            self.path,
+            "-",
+        )
+
+    @classmethod
+    def acquire(cls) -> "OutputSink":
+        """Return an empty sink, creating one if none is free."""
+        if cls._free:
+            return cls._free.pop()
+
+        cls._count += 1
+        if cls._dir is None:
+            cls._dir = tempfile.TemporaryDirectory(prefix="codex-last-message-")
+        path = os.path.join(cls._dir.name, f"last-message-{cls._count}")
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        return cls(fd=fd, path=path)
+
+    @classmethod
+    def close_all(cls) -> None:
+        """Close free sinks and remove the fallback directory."""
+        while cls._free:
+            os.close(cls._free.pop().fd)
+        if cls._dir is not None:
+            cls._dir.cleanup()
+            cls._dir = None
+
+    def read_text(self) -> str:
+        """Return what the CLI wrote to the sink."""
+        os.lseek(self.fd, 0, os.SEEK_SET)
+        return os.read(self.fd, os.fstat(self.fd).st_size).decode()
+
+    def release(self) -> None:
+        """Empty the sink and make it available to the next worker."""
+        os.ftruncate(self.fd, 0)
+        self._free.append(self)
+
+
+@dataclass
+class Worker:
+    """A spawned CLI process that is waiting for its prompt on stdin."""
+
+    process: asyncio.subprocess.Process
+    sink: OutputSink | None = None
+
+    async def discard(self) -> None:
+        """Stop the process if it is still running and recycle its sink."""
+        stopped = self.process.returncode is not None or await self._stop()
+        if self.sink is not None:
+            if stopped:
+                self.sink.release()
+            else:
+                # Something may still write to it; never hand it out again
+                os.close(self.sink.fd)
+            self.sink = None
+
+    async def _stop(self) -> bool:
+        """Terminate the process, escalating to SIGKILL; return whether it exited.
+
+        SIGTERM comes first because launchers such as the npm `codex` shim
+        forward it to the real binary, while SIGKILL would orphan the binary.
+        An orphan keeps the stdio pipes open, so wait() is always bounded.
+        """
+        for signal_process in (self.process.terminate, self.process.kill):
+            try:
+                signal_process()
+            except ProcessLookupError:
+                return True
+            try:
+                await asyncio.wait_for(self.process.wait(), WORKER_STOP_TIMEOUT_SECONDS)
+                return True
+            except asyncio.TimeoutError:
+                pass
+        return False
+
+
+class CliPool:
+    """Pool of pre-spawned CLI processes.
+
+    Both CLIs answer a single prompt read from stdin and then exit, so each
+    worker is handed out once and replaced in the background. Requests only
+    pay for writing the prompt, not for process creation and CLI startup.
+    """
+
+    def __init__(self, spawn, size: int):
+        self._spawn = spawn
+        self._size = size
+        self._idle: asyncio.Queue[Worker] = asyncio.Queue()
+        self._refills: set[asyncio.Task] = set()
+        self._spawning = 0
+
+    async def start(self) -> None:
+        """Fill the pool up to its configured size."""
+        for _ in range(self._size):
+            await self._refill()
+
+    async def acquire(self) -> Worker:
+        """Take a warm worker, spawning one directly if none is idle."""
+        while not self._idle.empty():
+            worker = self._idle.get_nowait()
+            self._schedule_refill()
+            if worker.process.returncode is None:
+                return worker
+            await worker.discard()
+
+        self._schedule_refill()
+        return await self._spawn()
+
+    async def close(self) -> None:
+        """Cancel pending refills and terminate idle workers."""
+        for task in self._refills:
+            task.cancel()
+        await asyncio.gather(*self._refills, return_exceptions=True)
+        idle = []
+        while not self._idle.empty():
+            idle.append(self._idle.get_nowait())
+        await asyncio.gather(*(worker.discard() for worker in idle))
+
+    def _schedule_refill(self) -> None:
+        task = asyncio.create_task(self._refill())
+        self._refills.add(task)
+        task.add_done_callback(self._refills.discard)
+
+    async def _refill(self) -> None:
+        if self._idle.qsize() + self._spawning >= self._size:
+            return
+        self._spawning += 1
+        try:
+            worker = await self._spawn()
+        except OSError:
+            # CLI missing or unspawnable; acquire() surfaces the error
+            return
+        finally:
+            self._spawning -= 1
+        self._idle.put_nowait(worker)
+
+
+# Workers are spawned by absolute path with close_fds=False so that
+# subprocess uses posix_spawn (vfork) rather than fork+exec, which would copy
+# the page tables of the whole server. This is safe because Python creates
+# descriptors non-inheritable, so no descriptors leak into the workers.
+_CLAUDE_ARGV = (CLAUDE_CLI_PATH, "-p")
+
+
+async def spawn_codex_worker() -> Worker:
+    """Start `codex exec` reading its prompt from stdin."""
+    sink = OutputSink.acquire()
+    try:
+        process = await asyncio.create_subprocess_exec(
+            *sink.argv,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            close_fds=False,
+        )
+    except BaseException:
+        sink.release()
+        raise
+    return Worker(process=process, sink=sink)
+
+
+async def spawn_claude_worker() -> Worker:
+    """Start `claude -p` reading its prompt from stdin."""
+    process = await asyncio.create_subprocess_exec(
+        *_CLAUDE_ARGV,
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        close_fds=False,
+    )
+    return Worker(process=process)
+
+
+codex_pool = CliPool(spawn_codex_worker, CLI_POOL_SIZE)
+claude_pool = CliPool(spawn_claude_worker, CLI_POOL_SIZE)
+
+
+def create_ssl_context() -> ssl.SSLContext:
+    """Build the TLS context for outgoing requests.
+
+    Honors SSL_CERT_FILE and SSL_CERT_DIR the way httpx does for its own
+    default context (needed behind TLS-intercepting proxies), and otherwise
+    uses the certifi bundle.
+    """
+    cert_file = os.getenv("SSL_CERT_FILE")
+    if cert_file and os.path.isfile(cert_file):
+        return ssl.create_default_context(cafile=cert_file)
+    cert_dir = os.getenv("SSL_CERT_DIR")
+    if cert_dir and os.path.isdir(cert_dir):
+        return ssl.create_default_context(capath=cert_dir)
+    return ssl.create_default_context(cafile=certifi.where())
+
+
+# Built once: creating an SSL context (loading the CA bundle) dominates
+# httpx client construction
+_SSL_CONTEXT = create_ssl_context()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Set up shared clients and CLI pools on startup, release them on shutdown."""
+    # One client for the app's lifetime keeps TLS connections to the Codex
+    # API alive; HTTP/2 multiplexes concurrent requests over one of them
+    app.state.http_client = httpx.AsyncClient(
+        base_url=CODEX_BASE_URL,
+        timeout=httpx.Timeout(120.0, connect=10.0),
+        limits=httpx.Limits(
+            max_keepalive_connections=20,
+            max_connections=100,
+            keepalive_expiry=30.0,
+        ),
+        http2=True,
+        verify=_SSL_CONTEXT,
+    )
+    # With a ChatGPT login Codex requests go straight to the API, so warm CLI
+    # processes would sit idle; the pool still fills itself on first use if
+    # the login goes away
+    if is_codex_cli_available() and await get_codex_credentials() is None:
+        await codex_pool.start()
+    if is_claude_cli_available():
+        await claude_pool.start()
+    yield
+    await asyncio.gather(codex_pool.close(), claude_pool.close())
+    await app.state.http_client.aclose()
+    OutputSink.close_all()
+    if redis_client is not None:
+        await redis_client.aclose()
+
+
+class ORJSONRequest(Request):
+    """Request that decodes its JSON body with orjson."""
+
+    async def json(self) -> Any:
+        if not hasattr(self, "_json"):
+            self._json = orjson.loads(await self.body())
+        return self._json
+
+
+class ORJSONRoute(APIRoute):
+    """Route that parses request bodies with orjson instead of the json module."""
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+
+        async def orjson_route_handler(request: Request) -> Response:
+            return await handler(ORJSONRequest(request.scope, request.receive))
+
+        return orjson_route_handler
+
+
+class ExtensionCORSMiddleware:
+    """CORS for Chrome extension origins only.
+
+    Extension origins all share the chrome-extension:// prefix, so a byte
+    prefix check replaces CORSMiddleware's regex match, and preflights are
+    answered without going through the app.
+    """
+
+    ORIGIN_PREFIX = b"chrome-extension://"
+    PREFLIGHT_HEADERS = [
+        (b"access-control-allow-methods", b"POST, OPTIONS"),
+        (b"access-control-allow-headers", b"Content-Type"),
+        (b"access-control-max-age", b"600"),
+        (b"vary", b"Origin"),
+    ]
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        origin = None
+        preflight = False
+        for name, value in scope["headers"]:
+            if name == b"origin":
+                origin = value
+            elif name == b"access-control-request-method":
+                preflight = scope["method"] == "OPTIONS"
+
+        if origin is None or not origin.startswith(self.ORIGIN_PREFIX):
+            await self.app(scope, receive, send)
+            return
+
+        allow_origin = (b"access-control-allow-origin", origin)
+        if preflight:
+            await send({
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [allow_origin, (b"content-length", b"0"), *self.PREFLIGHT_HEADERS],
+            })
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        async def send_with_cors(message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = [
+                    *message.get("headers", ()), allow_origin, (b"vary", b"Origin")
+                ]
+            await send(message)
+
+        await self.app(scope, receive, send_with_cors)
+
+
+app = FastAPI(title="Page Q&A Backend", lifespan=lifespan)
+app.router.route_class = ORJSONRoute
 
 # CORS: Allow requests from Chrome extensions
-app.add_middleware(
-    CORSMiddleware,
-    allow_origin_regex=r"^chrome-extension://.*$",
-    allow_methods=["POST", "OPTIONS"],
-    allow_headers=["Content-Type"],
-)
+app.add_middleware(ExtensionCORSMiddleware)
 
 
 class HistoryMessage(BaseModel):
-    role: str = Field(..., pattern="^(user|assistant)$")
+    model_config = ConfigDict(frozen=True)
+
+    role: Literal["user", "assistant"]
     content: str = Field(..., max_length=MAX_CONTEXT_CHARS)
 
 
 class AskRequest(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     question: str = Field(..., max_length=MAX_QUESTION_CHARS)
+    questions: list[Annotated[str, Field(max_length=MAX_QUESTION_CHARS)]] = Field(
+        default_factory=list, max_length=MAX_BATCH_QUESTIONS
+    )
     context: str = Field(..., max_length=MAX_CONTEXT_CHARS)
     url: str = Field(default="", max_length=2000)
     title: str = Field(default="", max_length=500)
-    history: list[HistoryMessage] = Field(default_factory=list, max_length=50)
-    provider: str = Field(default="codex", pattern="^(codex|claude)$")
+    history: list[HistoryMessage] = Field(default_factory=list, max_length=MAX_HISTORY_MESSAGES)
+    provider: Literal["codex", "claude"] = "codex"
 
 
 class AskResponse(BaseModel):
     answer: str
+    answers: list[str] = Field(default_factory=list)
 
 
 class SessionCreateRequest(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     context: str = Field(..., max_length=MAX_CONTEXT_CHARS)
     url: str = Field(default="", max_length=2000)
     title: str = Field(default="", max_length=500)
@@ -85,9 +497,15 @@ class SessionCreateResponse(BaseModel):
 
 
 class SessionAskRequest(BaseModel):
-    session_id: str
+    model_config = ConfigDict(frozen=True)
+
+    # Parsed as a UUID so arbitrary strings never reach the session store keys
+    session_id: uuid.UUID
     question: str = Field(..., max_length=MAX_QUESTION_CHARS)
-    provider: str = Field(default="codex", pattern="^(codex|claude)$")
+    questions: list[Annotated[str, Field(max_length=MAX_QUESTION_CHARS)]] = Field(
+        default_factory=list, max_length=MAX_BATCH_QUESTIONS
+    )
+    provider: Literal["codex", "claude"] = "codex"
 
 
 def smart_truncate(text: str, max_chars: int) -> str:
@@ -102,34 +520,30 @@ def smart_truncate(text: str, max_chars: int) -> str:
     if len(text) <= max_chars:
         return text
 
-    # Look for sentence boundaries in the last 500 chars before limit
+    # Look for sentence boundaries in the last 500 chars before limit.
+    # Searches take start/end bounds so the region is never copied out.
     search_start = max(0, max_chars - 500)
-    search_region = text[search_start:max_chars]
 
-    # Find sentence-ending punctuation followed by space or newline
-    sentence_pattern = re.compile(r'[.!?][\s\n]')
-    matches = list(sentence_pattern.finditer(search_region))
+    # Find the last sentence boundary
+    last_match = None
+    for last_match in _SENTENCE_RE.finditer(text, search_start, max_chars):
+        pass
 
-    if matches:
-        # Use the last sentence boundary found
-        last_match = matches[-1]
-        cut_point = search_start + last_match.end()
-        return text[:cut_point].rstrip()
+    if last_match is not None:
+        return text[:last_match.end()].rstrip()
 
     # Try paragraph boundary (double newline)
-    para_idx = search_region.rfind('\n\n')
+    para_idx = text.rfind('\n\n', search_start, max_chars)
     if para_idx != -1:
-        cut_point = search_start + para_idx
-        return text[:cut_point].rstrip()
+        return text[:para_idx].rstrip()
 
     # Try single newline
-    newline_idx = search_region.rfind('\n')
+    newline_idx = text.rfind('\n', search_start, max_chars)
     if newline_idx != -1:
-        cut_point = search_start + newline_idx
-        return text[:cut_point].rstrip()
+        return text[:newline_idx].rstrip()
 
     # Fall back to word boundary
-    space_idx = text[:max_chars].rfind(' ')
+    space_idx = text.rfind(' ', 0, max_chars)
     if space_idx > max_chars - 200:  # Only use if reasonably close to limit
         return text[:space_idx].rstrip() + "..."
 
@@ -140,12 +554,87 @@ def smart_truncate(text: str, max_chars: int) -> str:
 def cleanup_expired_sessions():
     """Remove sessions that have expired."""
     now = time.time()
-    expired = [
-        sid for sid, data in sessions.items()
-        if now - data["created_at"] > SESSION_EXPIRY_SECONDS
-    ]
-    for sid in expired:
-        del sessions[sid]
+    while _expiry_heap and _expiry_heap[0][0] < now:
+        _, sid = heapq.heappop(_expiry_heap)
+        sessions.pop(sid, None)
+
+
+async def save_session(session_id: str, session: dict) -> None:
+    """Store a new session until SESSION_EXPIRY_SECONDS after its creation."""
+    if redis_client is None:
+        cleanup_expired_sessions()
+        sessions[session_id] = {
+            **session,
+            "history": [],
+            "history_rendered": bytearray(),
+        }
+        expires_at = session["created_at"] + SESSION_EXPIRY_SECONDS
+        heapq.heappush(_expiry_heap, (expires_at, session_id))
+        return
+
+    await redis_client.set(
+        SESSION_KEY_PREFIX + session_id,
+        orjson.dumps(session),
+        ex=SESSION_EXPIRY_SECONDS,
+    )
+
+
+async def load_session(session_id: str) -> dict | None:
+    """Return a session with its history, or None if unknown or expired."""
+    if redis_client is None:
+        cleanup_expired_sessions()
+        return sessions.get(session_id)
+
+    key = SESSION_KEY_PREFIX + session_id
+    data, history, history_rendered = await (
+        redis_client.pipeline(transaction=False)
+        .get(key)
+        .lrange(f"{key}:hist", 0, -1)
+        .get(f"{key}:rendered")
+        .execute()
+    )
+    if data is None:
+        return None
+
+    session = orjson.loads(data)
+    session["history"] = [tuple(orjson.loads(item)) for item in history]
+    session["history_rendered"] = history_rendered or b""
+    return session
+
+
+async def append_session_turns(
+    session_id: str,
+    session: dict,
+    turns: list[tuple[str, str]],
+) -> None:
+    """Append (question, answer) pairs to a session's history.
+
+    The CLI rendering of the history is extended in place, so prompts never
+    re-render earlier turns.
+    """
+    messages = []
+    for question, answer in turns:
+        messages.append(("user", question))
+        messages.append(("assistant", answer))
+    rendered = render_history(messages)
+
+    if redis_client is None:
+        session["history"].extend(messages)
+        session["history_rendered"] += rendered
+        return
+
+    # History lives in its own keys and expires together with the session
+    history_key = f"{SESSION_KEY_PREFIX}{session_id}:hist"
+    rendered_key = f"{SESSION_KEY_PREFIX}{session_id}:rendered"
+    expires_at = int(session["created_at"] + SESSION_EXPIRY_SECONDS) + 1
+    await (
+        redis_client.pipeline(transaction=False)
+        .rpush(history_key, *map(orjson.dumps, messages))
+        .append(rendered_key, rendered)
+        .expireat(history_key, expires_at)
+        .expireat(rendered_key, expires_at)
+        .execute()
+    )
 
 
 # System prompt with strong injection defense
@@ -174,73 +663,85 @@ CRITICAL SECURITY RULES:
 
 Be concise and accurate in your responses."""
 
+# Every CLI prompt starts with this section, so encode it once
+_SYSTEM_PROMPT_SECTION = f"SYSTEM PROMPT:\n{SYSTEM_PROMPT}".encode()
+
+# The page header (URL and title lines) fills the first slot; an empty header
+# leaves a blank line before the page text
+_USER_MESSAGE_TEMPLATE = (
+    "%s\nBEGIN_UNTRUSTED_PAGE_TEXT\n%s\nEND_UNTRUSTED_PAGE_TEXT\n\nUser Question: %s"
+)
+
 
 def build_user_message(question: str, context: str, url: str, title: str) -> str:
     """Build the user message with clearly delimited untrusted content."""
-    parts = [f"Page URL: {url}" if url else "", f"Page Title: {title}" if title else ""]
-    header = "\n".join(p for p in parts if p)
+    # A single format sizes the result once instead of copying the ~50 KB
+    # context through several intermediate strings
+    header = ("Page URL: %s\n" % url if url else "") + (
+        "Page Title: %s\n" % title if title else ""
+    )
+    return _USER_MESSAGE_TEMPLATE % (header or "\n", context, question)
 
-    return f"""{header}
 
-BEGIN_UNTRUSTED_PAGE_TEXT
-{context}
-END_UNTRUSTED_PAGE_TEXT
+def is_claude_cli_available() -> bool:
+    """Check if the Claude CLI was found on PATH at startup."""
+    return CLAUDE_CLI_PATH is not None
 
-User Question: {question}"""
 
+def is_codex_cli_available() -> bool:
+    """Check if the Codex CLI was found on PATH at startup."""
+    return CODEX_CLI_PATH is not None
 
-def is_claude_cli_available() -> bool:
-    """Check if the Claude CLI is available on PATH."""
-    return shutil.which(CLAUDE_CLI_COMMAND) is not None
 
+def render_history(history: list[tuple[str, str]] | None) -> bytes:
+    """Render history for a CLI prompt as newline-prefixed "Role: content" lines."""
+    lines = []
+    for role, content in history or []:
+        label = "User" if role == "user" else "Assistant"
+        lines.append(f"\n{label}: {content}")
+    return "".join(lines).encode()
 
-def is_codex_cli_available() -> bool:
-    """Check if the Codex CLI is available on PATH."""
-    return shutil.which(CODEX_CLI_COMMAND) is not None
 
+def build_cli_prompt(user_message: str, history_rendered: bytes = b"") -> bytes:
+    """Build a single UTF-8 encoded prompt for a CLI.
 
-def build_cli_prompt(
-    system_prompt: str,
-    user_message: str,
-    history: list[HistoryMessage] | None = None,
-) -> str:
-    """Build a single prompt string for a CLI."""
-    sections = [f"SYSTEM PROMPT:\n{system_prompt}"]
+    history_rendered is the output of render_history, which sessions keep
+    up to date incrementally.
+    """
+    sections = [_SYSTEM_PROMPT_SECTION]
 
-    if history:
-        history_lines = []
-        for msg in history:
-            role = "User" if msg.role == "user" else "Assistant"
-            history_lines.append(f"{role}: {msg.content}")
-        sections.append("CONVERSATION HISTORY:\n" + "\n".join(history_lines))
+    if history_rendered:
+        sections.append(b"CONVERSATION HISTORY:" + history_rendered)
 
-    sections.append(f"CURRENT USER MESSAGE:\n{user_message}")
-    return "\n\n".join(sections)
+    sections.append(f"CURRENT USER MESSAGE:\n{user_message}".encode())
+    return b"\n\n".join(sections)
 
 
-async def call_prompt_cli(command: str, label: str, prompt: str) -> str:
-    """Run a CLI command with a prompt and return stdout."""
-    process = await asyncio.create_subprocess_exec(
-        command,
-        "-p",
-        prompt,
-        stdout=asyncio.subprocess.PIPE,
-        stderr=asyncio.subprocess.PIPE,
-    )
-    stdout, stderr = await process.communicate()
+def decode_cli_output(output: bytes) -> str:
+    """Strip and decode CLI output, decoding each byte only once."""
+    return output.strip().decode("utf-8", errors="replace")
+
 
-    if process.returncode != 0:
-        error_text = stderr.decode().strip() or stdout.decode().strip()
+async def call_prompt_cli(pool: CliPool, label: str, prompt: bytes) -> str:
+    """Send a prompt to a pooled CLI worker and return stdout."""
+    worker = await pool.acquire()
+    try:
+        stdout, stderr = await worker.process.communicate(input=prompt)
+    finally:
+        await worker.discard()
+
+    if worker.process.returncode != 0:
+        error_text = decode_cli_output(stderr) or decode_cli_output(stdout)
         raise HTTPException(
             status_code=500,
             detail=f"{label} CLI error: {error_text or 'unknown error'}",
         )
 
-    output = stdout.decode().strip()
-    return output if output else "No response generated."
+    output = decode_cli_output(stdout)
+    return output if output else NO_RESPONSE_ANSWER
 
 
-async def call_codex_cli(prompt: str) -> str:
+async def call_codex_cli(prompt: bytes) -> str:
     """Run the Codex CLI non-interactively and return the last message."""
     if not is_codex_cli_available():
         raise HTTPException(
@@ -248,58 +749,418 @@ async def call_codex_cli(prompt: str) -> str:
             detail="Codex CLI not found. Install Codex and ensure 'codex' is on PATH.",
         )
 
-    with tempfile.NamedTemporaryFile(prefix="codex-last-message-", delete=False) as tmp:
-        temp_path = Path(tmp.name)
+    worker = await codex_pool.acquire()
     try:
-        process = await asyncio.create_subprocess_exec(
-            CODEX_CLI_COMMAND,
-            "exec",
-            "--skip-git-repo-check",
-            "--output-last-message",
-            str(temp_path),
-            "-",
-            stdin=asyncio.subprocess.PIPE,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
-        )
-        stdout, stderr = await process.communicate(input=prompt.encode())
+        stdout, stderr = await worker.process.communicate(input=prompt)
 
-        if process.returncode != 0:
-            error_text = stderr.decode().strip() or stdout.decode().strip()
+        if worker.process.returncode != 0:
+            error_text = decode_cli_output(stderr) or decode_cli_output(stdout)
             raise HTTPException(
                 status_code=500,
                 detail=f"Codex CLI error: {error_text or 'unknown error'}",
             )
 
-        output = ""
-        if temp_path.exists():
-            output = temp_path.read_text().strip()
+        output = worker.sink.read_text().strip()
 
         if output:
             return output
 
-        fallback = stdout.decode().strip()
-        return fallback if fallback else "No response generated."
+        fallback = decode_cli_output(stdout)
+        return fallback if fallback else NO_RESPONSE_ANSWER
     finally:
-        temp_path.unlink(missing_ok=True)
+        await worker.discard()
+
+
+@functools.lru_cache(maxsize=16)
+def decode_jwt_payload(token: str) -> dict:
+    """Decode the claims of a JWT without verifying its signature."""
+    # The decoder ignores surplus padding, so always adding the most a
+    # segment can need is simpler than computing it
+    return orjson.loads(base64.urlsafe_b64decode(token.split(".")[1] + "=="))
+
+
+# (checked_at, mtime_ns, credentials) from the last look at auth.json
+_creds_cache: tuple[float, int, tuple[str, str] | None] | None = None
+
+
+async def get_codex_credentials() -> tuple[str, str] | None:
+    """Return (access_token, account_id) from the Codex ChatGPT login, if any.
+
+    The result is trusted for CODEX_CREDENTIALS_TTL_SECONDS without touching
+    the filesystem; after that auth.json is checked again in a worker thread
+    so the disk access never blocks the event loop.
+    """
+    cached = _creds_cache
+    if cached is not None and time.monotonic() - cached[0] < CODEX_CREDENTIALS_TTL_SECONDS:
+        return cached[2]
+    return await asyncio.to_thread(_refresh_codex_credentials)
+
+
+def _refresh_codex_credentials() -> tuple[str, str] | None:
+    """Stat auth.json and re-read it only if its modification time changed."""
+    global _creds_cache
+    now = time.monotonic()
+    try:
+        mtime_ns = CODEX_AUTH_FILE.stat().st_mtime_ns
+    except OSError:
+        _creds_cache = (now, -1, None)
+        return None
+
+    if _creds_cache is not None and _creds_cache[1] == mtime_ns:
+        credentials = _creds_cache[2]
+    else:
+        credentials = _load_codex_credentials()
+    _creds_cache = (now, mtime_ns, credentials)
+    return credentials
+
+
+def _read_codex_auth() -> dict | None:
+    """Read and parse auth.json."""
+    try:
+        with open(CODEX_AUTH_FILE, "rb") as f:
+            auth_data = orjson.loads(f.read())
+    except (OSError, orjson.JSONDecodeError):
+        return None
+    return auth_data if isinstance(auth_data, dict) else None
+
+
+def _write_codex_auth(auth_data: dict) -> None:
+    """Replace auth.json atomically so the CLI never sees a partial file."""
+    fd, tmp_path = tempfile.mkstemp(dir=CODEX_HOME, prefix=".auth-", suffix=".json")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(orjson.dumps(auth_data, option=orjson.OPT_INDENT_2))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, CODEX_AUTH_FILE)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def _load_codex_credentials() -> tuple[str, str] | None:
+    """Parse the access token and account id out of auth.json."""
+    auth_data = _read_codex_auth()
+    if auth_data is None:
+        return None
+
+    tokens = auth_data.get("tokens")
+    if not isinstance(tokens, dict):
+        return None
+    access_token = tokens.get("access_token")
+    id_token = tokens.get("id_token")
+    if not isinstance(access_token, str) or not isinstance(id_token, str):
+        return None
+    if not access_token or not id_token:
+        return None
+
+    try:
+        claims = decode_jwt_payload(id_token)
+    except (IndexError, ValueError):
+        return None
+    if not isinstance(claims, dict):
+        return None
+
+    account_id = tokens.get("account_id")
+    if not account_id:
+        auth_claims = claims.get("https://api.openai.com/auth")
+        if isinstance(auth_claims, dict):
+            account_id = auth_claims.get("chatgpt_account_id")
+    if not isinstance(account_id, str) or not account_id:
+        return None
+
+    return access_token, account_id
+
+
+_token_refresh_lock = asyncio.Lock()
+
+
+async def refresh_codex_login(
+    client: httpx.AsyncClient, rejected_token: str
+) -> tuple[str, str] | None:
+    """Refresh the ChatGPT login after rejected_token got a 401.
+
+    Uses the refresh token in auth.json the same way the Codex CLI does and
+    writes the new tokens back. Returns fresh credentials, or None if the
+    login cannot be refreshed and the user has to run `codex login`.
+    """
+    global _creds_cache
+    async with _token_refresh_lock:
+        # Another request may have refreshed (or the user logged in again)
+        # while this one waited for the lock
+        _creds_cache = None
+        credentials = await get_codex_credentials()
+        if credentials is not None and credentials[0] != rejected_token:
+            return credentials
+
+        auth_data = await asyncio.to_thread(_read_codex_auth)
+        tokens = (auth_data or {}).get("tokens")
+        if not isinstance(tokens, dict):
+            return None
+        refresh_token = tokens.get("refresh_token")
+        if not isinstance(refresh_token, str) or not refresh_token:
+            return None
+
+        try:
+            response = await client.post(
+                CODEX_TOKEN_URL,
+                json={
+                    "client_id": CODEX_CLIENT_ID,
+                    "grant_type": "refresh_token",
+                    "refresh_token": refresh_token,
+                    "scope": "openid profile email",
+                },
+            )
+        except httpx.HTTPError:
+            return None
+        if response.status_code != 200:
+            return None
+
+        try:
+            refreshed = orjson.loads(response.content)
+        except orjson.JSONDecodeError:
+            return None
+        if not isinstance(refreshed, dict):
+            return None
+        for key in ("id_token", "access_token", "refresh_token"):
+            if refreshed.get(key):
+                tokens[key] = refreshed[key]
+        auth_data["tokens"] = tokens
+        auth_data["last_refresh"] = datetime.now(timezone.utc).isoformat()
+        try:
+            await asyncio.to_thread(_write_codex_auth, auth_data)
+        except OSError:
+            return None
+
+        _creds_cache = None
+        return await get_codex_credentials()
+
+
+def _user_input_item(text: str) -> dict:
+    """Build a Responses API input item for a user message."""
+    return {"role": "user", "content": [{"type": "input_text", "text": text}]}
+
+
+def _assistant_input_item(text: str) -> dict:
+    """Build a Responses API input item for an earlier assistant reply."""
+    return {
+        "type": "message",
+        "role": "assistant",
+        "content": [{"type": "output_text", "text": text}],
+    }
+
+
+_INPUT_ITEM_BUILDERS = {"user": _user_input_item, "assistant": _assistant_input_item}
+
+
+def messages_to_codex_input(
+    user_message: str,
+    history: list[tuple[str, str]] | None,
+) -> list[dict]:
+    """Convert the history and current message to Responses API input items.
+
+    Empty or whitespace-only messages are dropped rather than spending
+    upstream tokens on them.
+    """
+    # The comprehension sizes the list up front; the role picks its builder
+    # with one dict lookup instead of a compare per message
+    items = [
+        _INPUT_ITEM_BUILDERS[role](content)
+        for role, content in history or ()
+        if content and not content.isspace()
+    ]
+    items.append(_user_input_item(user_message))
+    return items
+
+
+DATA_PREFIX = b"data: "
+_DELTA_EVENT_TYPE = b'"response.output_text.delta"'
+
+
+async def aiter_stream_lines(response: httpx.Response) -> AsyncIterator[bytes]:
+    """Yield the raw lines of an event stream without decoding them."""
+    buffer = bytearray()
+    async for chunk in response.aiter_bytes():
+        # Only the new chunk can hold the next newline
+        search_from = len(buffer)
+        buffer += chunk
+        start = 0
+        while (end := buffer.find(b"\n", search_from)) != -1:
+            yield bytes(buffer[start:end])
+            start = search_from = end + 1
+        del buffer[:start]
+    if buffer:
+        yield bytes(buffer)
+
+
+def parse_stream_delta(line: bytes) -> str | None:
+    """Return the output text delta carried by one Responses API stream line."""
+    # Most events, including the final one repeating the whole response,
+    # carry no delta; skip them without decoding any JSON
+    if not line.startswith(DATA_PREFIX) or _DELTA_EVENT_TYPE not in line:
+        return None
+    try:
+        data = orjson.loads(memoryview(line)[len(DATA_PREFIX):])
+    except orjson.JSONDecodeError:
+        return None
+    if data.get("type") == "response.output_text.delta":
+        return data.get("delta", "")
+    return None
+
+
+# Request fields that are the same for every call
+_CODEX_PAYLOAD_BASE = {
+    "model": CODEX_MODEL,
+    "instructions": SYSTEM_PROMPT,
+    "store": False,
+    "stream": True,
+}
+# ... serialized once; each request splices its input items onto the end
+_CODEX_PAYLOAD_PREFIX = orjson.dumps(_CODEX_PAYLOAD_BASE)[:-1] + b',"input":'
+
+
+# Headers that are the same for every call
+_CODEX_BASE_HEADERS = {
+    "Content-Type": "application/json",
+    "OpenAI-Beta": "responses=experimental",
+    "originator": "codex_cli_rs",
+    "Accept": "text/event-stream",
+}
+
+
+@functools.lru_cache(maxsize=4)
+def bearer_authorization(access_token: str) -> str:
+    """Return the Authorization header value for an access token."""
+    return f"Bearer {access_token}"
+
+
+# Uploads are gzipped (level 1 is nearly free next to the uplink time for
+# ~50 KB of page text) until a compressed body is refused and the same
+# request then succeeds uncompressed
+_gzip_uploads = True
+
+async def stream_openai_with_codex(
+    client: httpx.AsyncClient,
+    credentials: tuple[str, str],
+    user_message: str,
+    history: list[tuple[str, str]] | None,
+) -> AsyncIterator[str]:
+    """Stream answer text from the Codex Responses API as it is generated."""
+    global _gzip_uploads
+    access_token, account_id = credentials
+    headers = {
+        **_CODEX_BASE_HEADERS,
+        "Authorization": bearer_authorization(access_token),
+        "chatgpt-account-id": account_id,
+    }
+    body = b"".join((
+        _CODEX_PAYLOAD_PREFIX,
+        orjson.dumps(messages_to_codex_input(user_message, history)),
+        b"}",
+    ))
+
+    # Parse the event stream line by line as it arrives instead of
+    # buffering the whole body first
+    refreshed = False
+    compressed = _gzip_uploads
+    sent_plain_after_refusal = False
+    try:
+        while True:
+            if compressed:
+                request_headers = {**headers, "Content-Encoding": "gzip"}
+                content = gzip.compress(body, compresslevel=1)
+            else:
+                request_headers, content = headers, body
+
+            async with client.stream(
+                "POST", CODEX_RESPONSES_PATH, headers=request_headers, content=content
+            ) as response:
+                if compressed and response.status_code in (400, 415):
+                    # A backend that cannot decode gzip typically answers
+                    # with a generic parse error, so retry once uncompressed
+                    compressed = False
+                    sent_plain_after_refusal = True
+                    continue
+                if response.status_code == 401 and not refreshed:
+                    # Retry once with a refreshed login before asking the
+                    # user to log in again
+                    refreshed = True
+                    await response.aclose()
+                    credentials = await refresh_codex_login(client, access_token)
+                    if credentials is not None:
+                        access_token, account_id = credentials
+                        headers["Authorization"] = bearer_authorization(access_token)
+                        headers["chatgpt-account-id"] = account_id
+                        continue
+                if response.status_code == 401:
+                    raise HTTPException(
+                        status_code=401,
+                        detail="Codex login expired. Run 'codex login' again.",
+                    )
+                if response.status_code != 200:
+                    error_text = (await response.aread())[:500].decode(errors="replace")
+                    raise HTTPException(
+                        status_code=500,
+                        detail=f"Codex API error ({response.status_code}): {error_text}",
+                    )
+                if sent_plain_after_refusal:
+                    _gzip_uploads = False
+
+                async for line in aiter_stream_lines(response):
+                    delta = parse_stream_delta(line)
+                    if delta:
+                        yield delta
+            return
+    except httpx.HTTPError as e:
+        raise HTTPException(status_code=500, detail=f"Codex API request failed: {e}")
+
+
+async def call_openai_with_codex(
+    client: httpx.AsyncClient,
+    credentials: tuple[str, str],
+    user_message: str,
+    history: list[tuple[str, str]] | None,
+) -> str:
+    """Call the Codex Responses API directly with the ChatGPT login tokens."""
+    text_parts = [
+        delta
+        async for delta in stream_openai_with_codex(
+            client, credentials, user_message, history
+        )
+    ]
+    answer = "".join(text_parts).strip()
+    return answer if answer else NO_RESPONSE_ANSWER
 
 
 async def handle_codex_request(
+    client: httpx.AsyncClient,
     user_message: str,
-    history: list[HistoryMessage] | None,
+    history: list[tuple[str, str]] | None,
+    history_rendered: bytes | None = None,
 ) -> str:
-    """Handle request using Codex provider."""
+    """Handle request using Codex provider.
+
+    Uses the Responses API directly when a ChatGPT login is available, which
+    skips CLI startup entirely, and falls back to the Codex CLI otherwise.
+    """
+    credentials = await get_codex_credentials()
+    if credentials is not None:
+        return await call_openai_with_codex(client, credentials, user_message, history)
+
+    if history_rendered is None:
+        history_rendered = render_history(history)
     prompt = build_cli_prompt(
-        system_prompt=SYSTEM_PROMPT,
         user_message=user_message,
-        history=history,
+        history_rendered=history_rendered,
     )
     return await call_codex_cli(prompt)
 
 
 async def handle_claude_request(
+    client: httpx.AsyncClient,
     user_message: str,
-    history: list[HistoryMessage] | None,
+    history: list[tuple[str, str]] | None,
+    history_rendered: bytes | None = None,
 ) -> str:
     """Handle request using Claude provider."""
     if not is_claude_cli_available():
@@ -308,107 +1169,389 @@ async def handle_claude_request(
             detail="Claude CLI not found. Install Claude Code and ensure 'claude' is on PATH.",
         )
 
+    if history_rendered is None:
+        history_rendered = render_history(history)
     prompt = build_cli_prompt(
-        system_prompt=SYSTEM_PROMPT,
         user_message=user_message,
-        history=history,
+        history_rendered=history_rendered,
     )
     return await call_prompt_cli(
-        command=CLAUDE_CLI_COMMAND,
+        pool=claude_pool,
         label="Claude",
         prompt=prompt,
     )
 
 
-@app.post("/ask", response_model=AskResponse)
-async def ask(request: AskRequest) -> AskResponse:
-    """Process a question about page content."""
+_dispatch_semaphore = asyncio.Semaphore(MAX_CONCURRENCY)
+
+# Recent answers keyed by (page digest, history digest, question, provider)
+_answer_cache: TTLCache = TTLCache(
+    maxsize=ANSWER_CACHE_SIZE, ttl=ANSWER_CACHE_TTL_SECONDS
+)
+
+# Provider calls in progress, by answer cache key, so duplicates can join them
+_inflight: dict[tuple[str, str, str, str], asyncio.Task] = {}
+
+
+def digest_page(context: str, url: str, title: str) -> str:
+    """Return a short stable digest identifying a page's content."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{len(url)}:{url}{len(title)}:{title}".encode())
+    digest.update(context.encode())
+    return digest.hexdigest()
+
+
+def answer_cache_keys(
+    page_digest: str,
+    history_rendered: bytes,
+    questions: list[str],
+    provider: str,
+) -> list[tuple[str, str, str, str]]:
+    """Build answer cache keys for questions asked against the same page and history."""
+    history_digest = hashlib.blake2b(history_rendered, digest_size=16).hexdigest()
+    return [(page_digest, history_digest, question, provider) for question in questions]
+
+
+async def dispatch(
+    client: httpx.AsyncClient,
+    user_messages: list[str],
+    history: list[tuple[str, str]] | None,
+    provider: str,
+    history_rendered: bytes | None = None,
+    cache_keys: list[tuple[str, str, str, str]] | None = None,
+) -> list[str]:
+    """Answer independent user messages concurrently with the given provider.
+
+    At most MAX_CONCURRENCY provider calls run at once, across all requests.
+    When cache_keys are given, recent answers to the same question about the
+    same page and history are served from memory, and identical requests that
+    arrive while one is in flight wait for it instead of calling the provider.
+    """
+    handler = handle_claude_request if provider == "claude" else handle_codex_request
+
+    async def call(user_message: str, cache_key: tuple | None) -> str:
+        async with _dispatch_semaphore:
+            answer = await handler(client, user_message, history, history_rendered)
+
+        if cache_key is not None and answer != NO_RESPONSE_ANSWER:
+            _answer_cache[cache_key] = answer
+        return answer
+
+    async def run(user_message: str, cache_key: tuple | None) -> str:
+        if cache_key is None:
+            return await call(user_message, None)
+
+        cached = _answer_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        task = _inflight.get(cache_key)
+        if task is None:
+            task = asyncio.create_task(call(user_message, cache_key))
+            _inflight[cache_key] = task
+            task.add_done_callback(lambda _: _inflight.pop(cache_key, None))
+
+        # Shielded so one caller disconnecting does not cancel the others
+        return await asyncio.shield(task)
+
+    keys = cache_keys or [None] * len(user_messages)
+    return await asyncio.gather(*map(run, user_messages, keys))
+
+
+async def stream_answer(
+    client: httpx.AsyncClient,
+    user_message: str,
+    history: list[tuple[str, str]] | None,
+    provider: str,
+    history_rendered: bytes | None = None,
+) -> AsyncIterator[str]:
+    """Yield an answer in pieces as the provider produces them.
+
+    Only the direct Codex API streams; CLI providers yield their whole answer
+    once. Holds a dispatch slot until the generator is exhausted or closed.
+    """
+    async with _dispatch_semaphore:
+        if provider == "codex":
+            credentials = await get_codex_credentials()
+            if credentials is not None:
+                async for delta in stream_openai_with_codex(
+                    client, credentials, user_message, history
+                ):
+                    yield delta
+                return
 
-    if not request.question.strip():
+        handler = handle_claude_request if provider == "claude" else handle_codex_request
+        yield await handler(client, user_message, history, history_rendered)
+
+
+# Proxies must not buffer or cache the event stream
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+def sse_event(data: dict[str, str], event: str | None = None) -> bytes:
+    """Encode one server-sent event with a JSON payload."""
+    message = b"data: " + orjson.dumps(data) + b"\n\n"
+    if event is None:
+        return message
+    return b"event: " + event.encode() + b"\n" + message
+
+
+async def stream_response(
+    client: httpx.AsyncClient,
+    user_message: str,
+    history: list[tuple[str, str]] | None,
+    provider: str,
+    history_rendered: bytes,
+    cache_key: tuple[str, str, str, str],
+    on_answer: Callable[[str], Awaitable[None]] | None = None,
+) -> StreamingResponse:
+    """Stream one answer to the extension as server-sent events.
+
+    Each piece of text is sent as a `data: {"delta": ...}` event, followed by
+    an `event: done` carrying the full answer, or an `event: error` if the
+    provider fails part way. The first piece is awaited before responding so
+    failures that happen up front (expired login, missing CLI) still get a
+    proper HTTP status.
+    """
+    cached = _answer_cache.get(cache_key)
+    pieces = None
+    if cached is not None:
+        first = cached
+    else:
+        pieces = stream_answer(client, user_message, history, provider, history_rendered)
+        first = await anext(pieces, "")
+
+    async def events():
+        parts = [first]
+        try:
+            if first:
+                yield sse_event({"delta": first})
+            if pieces is not None:
+                async for delta in pieces:
+                    parts.append(delta)
+                    yield sse_event({"delta": delta})
+        except HTTPException as e:
+            yield sse_event({"detail": str(e.detail)}, "error")
+            return
+        finally:
+            # Release the dispatch slot even if the extension disconnects
+            if pieces is not None:
+                await pieces.aclose()
+
+        answer = "".join(parts).strip() or NO_RESPONSE_ANSWER
+        if answer != NO_RESPONSE_ANSWER:
+            _answer_cache[cache_key] = answer
+        if on_answer is not None:
+            await on_answer(answer)
+        yield sse_event({"answer": answer}, "done")
+
+    return StreamingResponse(
+        events(), media_type="text/event-stream", headers=SSE_HEADERS
+    )
+
+
+def is_blank(text: str) -> bool:
+    """Check for empty or whitespace-only text without copying it like strip() would."""
+    return not text or text.isspace()
+
+
+def collect_questions(question: str, questions: list[str]) -> list[str]:
+    """Return the stripped question followed by any batched follow-ups."""
+    collected = [q.strip() for q in (question, *questions)]
+    if not all(collected):
         raise HTTPException(status_code=400, detail="Question cannot be empty")
+    return collected
+
 
-    if not request.context.strip():
+@app.post("/ask", response_model=AskResponse)
+async def ask(request: AskRequest, http_request: Request) -> AskResponse:
+    """Process a question, or a batch of independent questions, about page content."""
+    questions = collect_questions(request.question, request.questions)
+
+    if is_blank(request.context):
         raise HTTPException(status_code=400, detail="Context cannot be empty")
 
     context = smart_truncate(request.context, MAX_CONTEXT_CHARS)
 
+    user_messages = [
+        build_user_message(
+            question=question,
+            context=context,
+            url=request.url,
+            title=request.title,
+        )
+        for question in questions
+    ]
+
+    # Internally history is plain (role, content) tuples
+    history = [(m.role, m.content) for m in request.history] or None
+    history_rendered = render_history(history)
+
+    cache_keys = answer_cache_keys(
+        digest_page(context, request.url, request.title),
+        history_rendered,
+        questions,
+        request.provider,
+    )
+    answers = await dispatch(
+        http_request.app.state.http_client,
+        user_messages,
+        history,
+        request.provider,
+        history_rendered,
+        cache_keys,
+    )
+
+    return AskResponse(answer=answers[0], answers=answers)
+
+
+@app.post("/ask/stream")
+async def ask_stream(request: AskRequest, http_request: Request) -> StreamingResponse:
+    """Process a question about page content, streaming the answer as it is generated."""
+    if request.questions:
+        raise HTTPException(status_code=400, detail="Batched questions cannot be streamed")
+    (question,) = collect_questions(request.question, [])
+
+    if is_blank(request.context):
+        raise HTTPException(status_code=400, detail="Context cannot be empty")
+
+    context = smart_truncate(request.context, MAX_CONTEXT_CHARS)
     user_message = build_user_message(
-        question=request.question.strip(),
+        question=question,
         context=context,
         url=request.url,
         title=request.title,
     )
 
-    history = request.history if request.history else None
-
-    if request.provider == "claude":
-        answer = await handle_claude_request(user_message, history)
-    else:
-        answer = await handle_codex_request(user_message, history)
+    history = [(m.role, m.content) for m in request.history] or None
+    history_rendered = render_history(history)
 
-    return AskResponse(answer=answer)
+    (cache_key,) = answer_cache_keys(
+        digest_page(context, request.url, request.title),
+        history_rendered,
+        [question],
+        request.provider,
+    )
+    return await stream_response(
+        http_request.app.state.http_client,
+        user_message,
+        history,
+        request.provider,
+        history_rendered,
+        cache_key,
+    )
 
 
 @app.post("/session/create", response_model=SessionCreateResponse)
 async def create_session(request: SessionCreateRequest) -> SessionCreateResponse:
     """Create a new session with stored context."""
-    cleanup_expired_sessions()
-
-    if not request.context.strip():
+    if is_blank(request.context):
         raise HTTPException(status_code=400, detail="Context cannot be empty")
 
     session_id = str(uuid.uuid4())
     context = smart_truncate(request.context, MAX_CONTEXT_CHARS)
 
-    sessions[session_id] = {
+    await save_session(session_id, {
         "context": context,
         "url": request.url,
         "title": request.title,
-        "history": [],
+        "page_digest": digest_page(context, request.url, request.title),
         "created_at": time.time(),
-    }
+    })
 
     return SessionCreateResponse(session_id=session_id)
 
 
 @app.post("/session/ask", response_model=AskResponse)
-async def session_ask(request: SessionAskRequest) -> AskResponse:
+async def session_ask(request: SessionAskRequest, http_request: Request) -> AskResponse:
     """Ask a question using an existing session."""
-    cleanup_expired_sessions()
+    session_id = str(request.session_id)
+    session = await load_session(session_id)
 
-    if request.session_id not in sessions:
+    if session is None:
         raise HTTPException(status_code=404, detail="Session not found or expired")
 
-    if not request.question.strip():
-        raise HTTPException(status_code=400, detail="Question cannot be empty")
+    questions = collect_questions(request.question, request.questions)
 
-    session = sessions[request.session_id]
+    user_messages = [
+        build_user_message(
+            question=question,
+            context=session["context"],
+            url=session["url"],
+            title=session["title"],
+        )
+        for question in questions
+    ]
+
+    # Batched questions all see the history as it was before this request
+    history = list(session["history"]) if session["history"] else None
+    history_rendered = bytes(session["history_rendered"])
+
+    cache_keys = answer_cache_keys(
+        session["page_digest"], history_rendered, questions, request.provider
+    )
+    answers = await dispatch(
+        http_request.app.state.http_client,
+        user_messages,
+        history,
+        request.provider,
+        history_rendered,
+        cache_keys,
+    )
+
+    # Store in session history
+    await append_session_turns(session_id, session, list(zip(questions, answers)))
+
+    return AskResponse(answer=answers[0], answers=answers)
+
+
+@app.post("/session/ask/stream")
+async def session_ask_stream(
+    request: SessionAskRequest, http_request: Request
+) -> StreamingResponse:
+    """Ask a question using an existing session, streaming the answer as it is generated."""
+    session_id = str(request.session_id)
+    session = await load_session(session_id)
+
+    if session is None:
+        raise HTTPException(status_code=404, detail="Session not found or expired")
+
+    if request.questions:
+        raise HTTPException(status_code=400, detail="Batched questions cannot be streamed")
+    (question,) = collect_questions(request.question, [])
 
     user_message = build_user_message(
-        question=request.question.strip(),
+        question=question,
         context=session["context"],
         url=session["url"],
         title=session["title"],
     )
 
-    history = session["history"] if session["history"] else None
+    history = list(session["history"]) if session["history"] else None
+    history_rendered = bytes(session["history_rendered"])
 
-    if request.provider == "claude":
-        answer = await handle_claude_request(user_message, history)
-    else:
-        answer = await handle_codex_request(user_message, history)
-
-    # Store in session history
-    session["history"].append(HistoryMessage(role="user", content=request.question.strip()))
-    session["history"].append(HistoryMessage(role="assistant", content=answer))
+    (cache_key,) = answer_cache_keys(
+        session["page_digest"], history_rendered, [question], request.provider
+    )
 
-    return AskResponse(answer=answer)
+    async def store_turn(answer: str) -> None:
+        await append_session_turns(session_id, session, [(question, answer)])
+
+    return await stream_response(
+        http_request.app.state.http_client,
+        user_message,
+        history,
+        request.provider,
+        history_rendered,
+        cache_key,
+        on_answer=store_turn,
+    )
 
 
 @app.get("/health")
 async def health():
     """Health check endpoint."""
-    codex_available = is_codex_cli_available()
+    codex_available = is_codex_cli_available() or await get_codex_credentials() is not None
     claude_available = is_claude_cli_available()
 
     providers = []
@@ -430,10 +1573,13 @@ if __name__ == "__main__":
 
     # Check credentials
     claude_available = is_claude_cli_available()
-    codex_available = is_codex_cli_available()
+    codex_login = asyncio.run(get_codex_credentials()) is not None
+    codex_available = codex_login or is_codex_cli_available()
 
     print("Available providers:")
-    if codex_available:
+    if codex_login:
+        print(f"  - Codex: available (ChatGPT login in {CODEX_AUTH_FILE})")
+    elif codex_available:
         print("  - Codex: available (CLI on PATH)")
     else:
         print("  - Codex: not configured (install Codex CLI)")
@@ -454,4 +1600,16 @@ if __name__ == "__main__":
 
     print(f"Server: http://localhost:8787")
 
-    uvicorn.run(app, host="127.0.0.1", port=8787)
+    # The asyncio loop, not uvloop: uvloop spawns subprocesses through libuv,
+    # which bypasses the posix_spawn path the CLI pools rely on. http "auto"
+    # picks httptools when installed. One worker: sessions, caches and the
+    # CLI pools all live in this process
+    uvicorn.run(
+        app,
+        host="127.0.0.1",
+        port=8787,
+        loop="asyncio",
+        http="auto",
+        log_level="warning",
+        access_log=False,
+    )
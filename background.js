@@ -1,6 +1,7 @@
 // Background service worker for ai-slider
 
-const BACKEND_URL = "http://localhost:8787";
+importScripts("config.js");
+
 const CONTEXT_CHAR_LIMIT = 40000;
 
 // Create context menu on install
@@ -77,15 +78,6 @@ chrome.runtime.onMessage.addListener((message, sender, sendResponse) => {
     return true; // Keep channel open for async response
   }
 
-  if (message.type === "ask") {
-    handleAsk(message.question, message.context, message.url, message.title, message.history || [], message.provider || "codex")
-      .then(sendResponse)
-      .catch((err) => {
-        sendResponse({ error: err.message });
-      });
-    return true;
-  }
-
   if (message.type === "create-session") {
     handleCreateSession(message.context, message.url, message.title)
       .then(sendResponse)
@@ -94,20 +86,6 @@ chrome.runtime.onMessage.addListener((message, sender, sendResponse) => {
       });
     return true;
   }
-
-  if (message.type === "session-ask") {
-    handleSessionAsk(message.sessionId, message.question, message.provider || "codex")
-      .then(sendResponse)
-      .catch((err) => {
-        // Check if session expired
-        if (err.message.includes("Session not found") || err.message.includes("404")) {
-          sendResponse({ sessionExpired: true, error: err.message });
-        } else {
-          sendResponse({ error: err.message });
-        }
-      });
-    return true;
-  }
 });
 
 async function handleExtract(mode) {
@@ -299,44 +277,6 @@ function extractPage() {
   return text;
 }
 
-async function handleAsk(question, context, url, title, history, provider) {
-  if (!question || !question.trim()) {
-    throw new Error("Please enter a question");
-  }
-
-  if (!context || !context.trim()) {
-    throw new Error("No context available. Use 'Use Selection' or 'Use Page' first.");
-  }
-
-  const response = await fetch(`${BACKEND_URL}/ask`, {
-    method: "POST",
-    headers: {
-      "Content-Type": "application/json",
-    },
-    body: JSON.stringify({
-      question: question.trim(),
-      context: context,
-      url: url || "",
-      title: title || "",
-      history: history || [],
-      provider: provider || "codex",
-    }),
-  });
-
-  if (!response.ok) {
-    const errorText = await response.text();
-    throw new Error(`Backend error (${response.status}): ${errorText}`);
-  }
-
-  const data = await response.json();
-
-  if (data.error) {
-    throw new Error(data.error);
-  }
-
-  return { answer: data.answer };
-}
-
 async function handleCreateSession(context, url, title) {
   if (!context || !context.trim()) {
     throw new Error("No context available for session creation.");
@@ -362,38 +302,3 @@ async function handleCreateSession(context, url, title) {
   const data = await response.json();
   return { sessionId: data.session_id };
 }
-
-async function handleSessionAsk(sessionId, question, provider) {
-  if (!question || !question.trim()) {
-    throw new Error("Please enter a question");
-  }
-
-  if (!sessionId) {
-    throw new Error("No session ID provided");
-  }
-
-  const response = await fetch(`${BACKEND_URL}/session/ask`, {
-    method: "POST",
-    headers: {
-      "Content-Type": "application/json",
-    },
-    body: JSON.stringify({
-      session_id: sessionId,
-      question: question.trim(),
-      provider: provider || "codex",
-    }),
-  });
-
-  if (!response.ok) {
-    const errorText = await response.text();
-    throw new Error(`Backend error (${response.status}): ${errorText}`);
-  }
-
-  const data = await response.json();
-
-  if (data.error) {
-    throw new Error(data.error);
-  }
-
-  return { answer: data.answer };
-}
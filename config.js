@@ -0,0 +1,3 @@
+// Settings shared by the side panel and the background service worker
+
+const BACKEND_URL = "http://localhost:8787";
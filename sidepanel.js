@@ -289,6 +289,92 @@ function addMessage(role, content) {
   messageHistory.push({ role, content });
 }
 
+// Assistant message that fills in as the answer streams in
+function addStreamingMessage() {
+  clearWelcomeMessage();
+
+  const messageEl = document.createElement("div");
+  messageEl.className = "message assistant";
+  chatMessages.appendChild(messageEl);
+
+  let pendingText = null;
+  return {
+    update(text) {
+      // Re-render at most once per frame however fast deltas arrive
+      if (pendingText === null) {
+        requestAnimationFrame(() => {
+          if (pendingText === null) return;
+          messageEl.innerHTML = formatMessageContent(pendingText);
+          pendingText = null;
+          scrollToBottom();
+        });
+      }
+      pendingText = text;
+    },
+    finish(answer) {
+      pendingText = null;
+      messageEl.innerHTML = formatMessageContent(answer);
+      scrollToBottom();
+      messageHistory.push({ role: "assistant", content: answer });
+    },
+    remove() {
+      messageEl.remove();
+    },
+  };
+}
+
+// POST to a streaming endpoint and read its server-sent events.
+// Calls onText with the answer so far; resolves with the full answer.
+async function streamAnswer(path, body, onText) {
+  const response = await fetch(`${BACKEND_URL}${path}`, {
+    method: "POST",
+    headers: {
+      "Content-Type": "application/json",
+    },
+    body: JSON.stringify(body),
+  });
+
+  if (!response.ok) {
+    const errorText = await response.text();
+    const error = new Error(`Backend error (${response.status}): ${errorText}`);
+    error.status = response.status;
+    throw error;
+  }
+
+  const reader = response.body.pipeThrough(new TextDecoderStream()).getReader();
+  let buffer = "";
+  let text = "";
+
+  while (true) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += value;
+
+    let boundary;
+    while ((boundary = buffer.indexOf("\n\n")) !== -1) {
+      const rawEvent = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+
+      let event = "message";
+      let data = "";
+      for (const line of rawEvent.split("\n")) {
+        if (line.startsWith("event: ")) event = line.slice(7);
+        else if (line.startsWith("data: ")) data += line.slice(6);
+      }
+      if (!data) continue;
+
+      const payload = JSON.parse(data);
+      if (event === "done") return payload.answer;
+      if (event === "error") throw new Error(payload.detail);
+
+      text += payload.delta;
+      onText(text);
+    }
+  }
+
+  throw new Error("Connection closed before the answer was complete");
+}
+
 function addErrorMessage(content) {
   clearWelcomeMessage();
 
@@ -371,20 +457,33 @@ async function sendMessage() {
   setInputEnabled(false);
   showTypingIndicator();
 
+  let streamingMessage = null;
+  const onText = (text) => {
+    if (!streamingMessage) {
+      hideTypingIndicator();
+      streamingMessage = addStreamingMessage();
+    }
+    streamingMessage.update(text);
+  };
+
   try {
-    let result;
+    let answer = null;
 
     // Try session-based request first if we have a session
     if (currentSessionId) {
-      result = await chrome.runtime.sendMessage({
-        type: "session-ask",
-        sessionId: currentSessionId,
-        question: question,
-        provider: currentProvider,
-      });
-
-      // If session expired, fall back to regular request
-      if (result.sessionExpired) {
+      try {
+        answer = await streamAnswer(
+          "/session/ask/stream",
+          {
+            session_id: currentSessionId,
+            question: question,
+            provider: currentProvider,
+          },
+          onText
+        );
+      } catch (err) {
+        // If session expired, fall back to regular request
+        if (err.status !== 404) throw err;
         currentSessionId = null;
       }
     }
@@ -394,26 +493,30 @@ async function sendMessage() {
       // Build conversation history with sliding window
       const history = getSlidingWindowHistory();
 
-      result = await chrome.runtime.sendMessage({
-        type: "ask",
-        question: question,
-        context: currentContext,
-        url: currentUrl,
-        title: currentTitle,
-        history: history,
-        provider: currentProvider,
-      });
+      answer = await streamAnswer(
+        "/ask/stream",
+        {
+          question: question,
+          context: currentContext,
+          url: currentUrl || "",
+          title: currentTitle || "",
+          history: history,
+          provider: currentProvider,
+        },
+        onText
+      );
     }
 
     hideTypingIndicator();
-
-    if (result.error) {
-      throw new Error(result.error);
+    if (!streamingMessage) {
+      streamingMessage = addStreamingMessage();
     }
-
-    addMessage("assistant", result.answer);
+    streamingMessage.finish(answer);
   } catch (err) {
     hideTypingIndicator();
+    if (streamingMessage) {
+      streamingMessage.remove();
+    }
 
     let errorMessage = err.message;
 
@@ -570,7 +673,7 @@ async function saveProviderPreference(provider) {
 
 async function checkAvailableProviders() {
   try {
-    const response = await fetch("http://localhost:8787/health");
+    const response = await fetch(`${BACKEND_URL}/health`);
     if (!response.ok) return;
 
     const data = await response.json();